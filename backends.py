@@ -0,0 +1,459 @@
+import io
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+# -----------------------
+# Query backends
+# -----------------------
+# The dashboard never touches a DataFrame directly: it narrows a backend with
+# `isin` / `between` (one call per sidebar filter) and then asks it for the
+# small results it renders (metrics, value counts, describe, correlations...).
+#
+#   PandasBackend  -> default, everything runs on the in-memory DataFrame
+#   DuckDBBackend  -> filters become WHERE clauses and aggregates run inside
+#                     DuckDB over a CSV/Parquet/.duckdb file, so only the result
+#                     sets come back to Python
+
+DESCRIBE_STATS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+BOX_MAX_OUTLIERS = 200  # most extreme distinct outliers returned by box_stats
+
+
+def plain_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def normalize_filter_values(values):
+    """Plain, order-independent `isin` values (numpy scalars -> Python)."""
+    return tuple(sorted((plain_value(v) for v in values), key=repr))
+
+
+class QueryBackend(ABC):
+    """Filterable view over the student dataset.
+
+    `filters` records the narrowing applied so far, e.g.
+    ``(("isin", "sex", ("F",)), ("between", "studytime", (1, 3)))``.
+    """
+
+    columns = []
+    filters = ()
+
+    @abstractmethod
+    def isin(self, column, values):
+        ...
+
+    @abstractmethod
+    def between(self, column, low, high):
+        ...
+
+    @abstractmethod
+    def count(self):
+        ...
+
+    def __len__(self):
+        return int(self.count())
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @abstractmethod
+    def numeric_columns(self):
+        ...
+
+    @abstractmethod
+    def unique(self, column):
+        ...
+
+    @abstractmethod
+    def value_range(self, column):
+        ...
+
+    @abstractmethod
+    def mean(self, column):
+        ...
+
+    @abstractmethod
+    def share_at_least(self, column, threshold):
+        ...
+
+    @abstractmethod
+    def missing_count(self):
+        ...
+
+    @abstractmethod
+    def duplicate_count(self):
+        ...
+
+    @abstractmethod
+    def head(self, n):
+        ...
+
+    @abstractmethod
+    def info(self):
+        ...
+
+    @abstractmethod
+    def value_counts(self, column):
+        ...
+
+    @abstractmethod
+    def group_mean(self, by, column):
+        ...
+
+    @abstractmethod
+    def describe(self):
+        ...
+
+    @abstractmethod
+    def corr(self):
+        ...
+
+    @abstractmethod
+    def corr_pair(self, a, b):
+        ...
+
+    @abstractmethod
+    def box_stats(self, column, max_outliers=BOX_MAX_OUTLIERS):
+        """Tukey boxplot summary in `matplotlib.axes.Axes.bxp` form, or None if empty."""
+
+    @abstractmethod
+    def sample(self, columns, n):
+        """At most `n` random rows of `columns`, for scatter plots."""
+
+
+# -----------------------
+# Pandas (default)
+# -----------------------
+class PandasBackend(QueryBackend):
+    def __init__(self, df, filters=()):
+        self._df = df
+        self.filters = tuple(filters)
+        self.columns = df.columns.tolist()
+
+    def isin(self, column, values):
+        return PandasBackend(
+            self._df[self._df[column].isin(values)],
+            self.filters + (("isin", column, normalize_filter_values(values)),),
+        )
+
+    def between(self, column, low, high):
+        df = self._df
+        return PandasBackend(
+            df[(df[column] >= low) & (df[column] <= high)],
+            self.filters + (("between", column, (plain_value(low), plain_value(high))),),
+        )
+
+    def count(self):
+        return len(self._df)
+
+    def numeric_columns(self):
+        return self._df.select_dtypes(include=[np.number]).columns.tolist()
+
+    def unique(self, column):
+        return self._df[column].unique().tolist()
+
+    def value_range(self, column):
+        return self._df[column].min(), self._df[column].max()
+
+    def mean(self, column):
+        return self._df[column].mean()
+
+    def share_at_least(self, column, threshold):
+        return (self._df[column] >= threshold).mean()
+
+    def missing_count(self):
+        return int(self._df.isnull().sum().sum())
+
+    def duplicate_count(self):
+        return int(self._df.duplicated().sum())
+
+    def head(self, n):
+        return self._df.head(n)
+
+    def info(self):
+        buffer = io.StringIO()
+        self._df.info(buf=buffer)
+        return buffer.getvalue()
+
+    def value_counts(self, column):
+        return self._df[column].value_counts()
+
+    def group_mean(self, by, column):
+        return self._df.groupby(by)[column].mean()
+
+    def describe(self):
+        return self._df.describe(include=[np.number]).transpose()
+
+    def corr(self):
+        return self._df.corr(numeric_only=True)
+
+    def corr_pair(self, a, b):
+        return self._df[a].corr(self._df[b])
+
+    def box_stats(self, column, max_outliers=BOX_MAX_OUTLIERS):
+        values = self._df[column].dropna()
+        if values.empty:
+            return None
+        q1, med, q3 = (float(v) for v in values.quantile([0.25, 0.5, 0.75]))
+        low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        inside = values[(values >= low) & (values <= high)]
+        outliers = pd.Series(values[(values < low) | (values > high)].unique(), dtype=float)
+        extreme = outliers[(outliers - med).abs().sort_values(ascending=False).index[:max_outliers]]
+        return {
+            "q1": q1, "med": med, "q3": q3,
+            "whislo": float(inside.min()), "whishi": float(inside.max()),
+            "fliers": sorted(float(v) for v in extreme),
+        }
+
+    def sample(self, columns, n):
+        df = self._df[columns]
+        return df if len(df) <= n else df.sample(n, random_state=0)
+
+
+# -----------------------
+# DuckDB (embedded SQL engine)
+# -----------------------
+NUMERIC_SQL_TYPES = {
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+    "FLOAT", "REAL", "DOUBLE",
+}
+
+
+def quote_ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def quote_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _nan_if_none(value):
+    return np.nan if value is None else value
+
+
+class DuckDBBackend(QueryBackend):
+    """Runs every filter and aggregate as SQL against `source`.
+
+    `source` is any DuckDB table expression, e.g. a table name or
+    ``read_parquet('students.parquet')``. Use `DuckDBBackend.open` to build
+    one from a file path.
+    """
+
+    def __init__(self, con, source, where=(), params=(), schema=None, filters=()):
+        self._con = con
+        self._source = source
+        self._where = list(where)
+        self._params = list(params)
+        self.filters = tuple(filters)
+        if schema is None:
+            schema = self._fetchall(f"DESCRIBE SELECT * FROM {source}")
+            schema = [(row[0], row[1]) for row in schema]
+        self._schema = schema
+        self.columns = [name for name, _ in schema]
+
+    @classmethod
+    def open(cls, path, table="students"):
+        import duckdb  # optional dependency, only needed for this backend
+
+        lower = path.lower()
+        if lower.endswith((".duckdb", ".db")):
+            con = duckdb.connect(path, read_only=True)
+            source = quote_ident(table)
+        else:
+            con = duckdb.connect()
+            if lower.endswith(".parquet"):
+                source = f"read_parquet({quote_literal(path)})"
+            else:
+                source = f"read_csv_auto({quote_literal(path)})"
+        return cls(con, source)
+
+    # --- SQL helpers ---
+    def _fetchall(self, sql, params=()):
+        # one cursor per query: Streamlit serves each session from its own thread
+        with self._con.cursor() as cur:
+            return cur.execute(sql, list(params)).fetchall()
+
+    def _fetchdf(self, sql, params=()):
+        with self._con.cursor() as cur:
+            return cur.execute(sql, list(params)).fetchdf()
+
+    def _from(self, *conditions):
+        sql = f"FROM {self._source}"
+        where = self._where + list(conditions)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return sql
+
+    def _aggregate(self, *expressions, params=()):
+        # `params` bind the placeholders in `expressions`, which precede the WHERE clause
+        row = self._fetchall(f"SELECT {', '.join(expressions)} {self._from()}",
+                             list(params) + self._params)[0]
+        return [_nan_if_none(value) for value in row]
+
+    def _narrow(self, clause, params, spec):
+        return DuckDBBackend(
+            self._con,
+            self._source,
+            self._where + [clause],
+            self._params + list(params),
+            self._schema,
+            self.filters + (spec,),
+        )
+
+    # --- Filters ---
+    def isin(self, column, values):
+        values = normalize_filter_values(values)
+        spec = ("isin", column, values)
+        if not values:
+            return self._narrow("FALSE", [], spec)
+        placeholders = ", ".join("?" for _ in values)
+        return self._narrow(f"{quote_ident(column)} IN ({placeholders})", values, spec)
+
+    def between(self, column, low, high):
+        low, high = plain_value(low), plain_value(high)
+        return self._narrow(f"{quote_ident(column)} BETWEEN ? AND ?", [low, high],
+                            ("between", column, (low, high)))
+
+    # --- Aggregates ---
+    def count(self):
+        return self._aggregate("count(*)")[0]
+
+    def numeric_columns(self):
+        return [
+            name for name, sql_type in self._schema
+            if sql_type in NUMERIC_SQL_TYPES or sql_type.startswith("DECIMAL")
+        ]
+
+    def unique(self, column):
+        col = quote_ident(column)
+        rows = self._fetchall(f"SELECT DISTINCT {col} {self._from()} ORDER BY 1", self._params)
+        return [_nan_if_none(row[0]) for row in rows]
+
+    def value_range(self, column):
+        col = quote_ident(column)
+        low, high = self._aggregate(f"min({col})", f"max({col})")
+        return low, high
+
+    def mean(self, column):
+        return self._aggregate(f"avg({quote_ident(column)})")[0]
+
+    def share_at_least(self, column, threshold):
+        col = quote_ident(column)
+        return self._aggregate(f"avg(CASE WHEN {col} >= {float(threshold)} THEN 1.0 ELSE 0.0 END)")[0]
+
+    def missing_count(self):
+        if not self.columns:
+            return 0
+        totals = [f"count(*) - count({quote_ident(c)})" for c in self.columns]
+        return int(sum(self._aggregate(*totals)))
+
+    def duplicate_count(self):
+        row = self._fetchall(
+            f"SELECT count(*) - (SELECT count(*) FROM (SELECT DISTINCT * {self._from()})) {self._from()}",
+            self._params + self._params,
+        )[0]
+        return int(row[0])
+
+    def head(self, n):
+        return self._fetchdf(f"SELECT * {self._from()} LIMIT {int(n)}", self._params)
+
+    def info(self):
+        counts = self._aggregate("count(*)", *[f"count({quote_ident(c)})" for c in self.columns])
+        total, non_null = counts[0], counts[1:]
+        width = max([len("Column")] + [len(c) for c in self.columns])
+        lines = [
+            f"DuckDB source: {self._source}",
+            f"{total} entries",
+            f"Data columns (total {len(self.columns)} columns):",
+            f" #   {'Column'.ljust(width)}  Non-Null Count  Dtype",
+            f"---  {'-' * width}  --------------  -----",
+        ]
+        for i, ((name, sql_type), n) in enumerate(zip(self._schema, non_null)):
+            lines.append(f" {str(i).ljust(3)} {name.ljust(width)}  {f'{n} non-null'.ljust(14)}  {sql_type}")
+        return "\n".join(lines) + "\n"
+
+    def value_counts(self, column):
+        col = quote_ident(column)
+        result = self._fetchdf(
+            # NULL keys are dropped, as pandas does
+            f"SELECT {col}, count(*) AS count {self._from(f'{col} IS NOT NULL')} GROUP BY {col} ORDER BY count DESC",
+            self._params,
+        )
+        return result.set_index(column)["count"]
+
+    def group_mean(self, by, column):
+        key, col = quote_ident(by), quote_ident(column)
+        result = self._fetchdf(
+            f"SELECT {key}, avg({col}) AS {col} {self._from(f'{key} IS NOT NULL')} GROUP BY {key} ORDER BY {key}",
+            self._params,
+        )
+        return result.set_index(by)[column]
+
+    def describe(self):
+        numeric = self.numeric_columns()
+        expressions = []
+        for name in numeric:
+            col = quote_ident(name)
+            expressions += [
+                f"count({col})",
+                f"avg({col})",
+                f"stddev_samp({col})",
+                f"min({col})",
+                f"quantile_cont({col}, 0.25)",
+                f"quantile_cont({col}, 0.5)",
+                f"quantile_cont({col}, 0.75)",
+                f"max({col})",
+            ]
+        if not expressions:
+            return pd.DataFrame(columns=DESCRIBE_STATS)
+        values = np.array(self._aggregate(*expressions), dtype=float)
+        return pd.DataFrame(values.reshape(len(numeric), len(DESCRIBE_STATS)),
+                            index=numeric, columns=DESCRIBE_STATS)
+
+    def corr(self):
+        numeric = self.numeric_columns()
+        pairs = [(i, j) for i in range(len(numeric)) for j in range(i, len(numeric))]
+        matrix = np.full((len(numeric), len(numeric)), np.nan)
+        if pairs:
+            values = self._aggregate(*[
+                f"corr({quote_ident(numeric[i])}, {quote_ident(numeric[j])})" for i, j in pairs
+            ])
+            for (i, j), value in zip(pairs, values):
+                matrix[i, j] = matrix[j, i] = value
+        return pd.DataFrame(matrix, index=numeric, columns=numeric)
+
+    def corr_pair(self, a, b):
+        return self._aggregate(f"corr({quote_ident(a)}, {quote_ident(b)})")[0]
+
+    def box_stats(self, column, max_outliers=BOX_MAX_OUTLIERS):
+        col = quote_ident(column)
+        q1, med, q3 = self._aggregate(*[f"quantile_cont({col}, {q})" for q in (0.25, 0.5, 0.75)])
+        if np.isnan(q1):
+            return None
+        low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        whislo, whishi = self._aggregate(
+            f"min({col}) FILTER (WHERE {col} >= ?)",
+            f"max({col}) FILTER (WHERE {col} <= ?)",
+            params=[low, high],
+        )
+        rows = self._fetchall(
+            f"SELECT v FROM (SELECT DISTINCT {col} AS v {self._from()}) "
+            f"WHERE v < ? OR v > ? ORDER BY abs(v - ?) DESC LIMIT {int(max_outliers)}",
+            self._params + [low, high, med],
+        )
+        return {
+            "q1": float(q1), "med": float(med), "q3": float(q3),
+            "whislo": float(whislo), "whishi": float(whishi),
+            "fliers": sorted(float(row[0]) for row in rows),
+        }
+
+    def sample(self, columns, n):
+        projection = ", ".join(quote_ident(c) for c in columns)
+        return self._fetchdf(
+            f"SELECT * FROM (SELECT {projection} {self._from()}) "
+            f"USING SAMPLE reservoir({int(n)} ROWS) REPEATABLE (0)",
+            self._params,
+        )
@@ -0,0 +1,372 @@
+import copy
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from importlib import metadata
+
+import pandas as pd
+
+from backends import BOX_MAX_OUTLIERS, QueryBackend
+
+# -----------------------
+# Shared on-disk result store
+# -----------------------
+# `st.cache_data` only lives in one process, so every replica behind the load
+# balancer would recompute the same aggregates and charts. ResultStore keeps
+# computed artifacts (statistics, correlation matrices, PNGs, chart specs) in
+# one SQLite file that any number of processes can share, e.g. on a shared
+# volume. Keys combine the code version, the dataset fingerprint, the filter
+# state and the artifact name, so a restart or a new replica starts warm.
+#
+# - atomic writes: each entry is written in a single transaction, readers
+#   never see a half-written value
+# - multi-process access: SQLite file locking + busy timeout (the default
+#   rollback journal is used rather than WAL, which breaks on network volumes)
+# - size-based eviction: least recently used entries are dropped once the
+#   total payload exceeds `max_bytes`
+#
+# Entries are stored as data, never as pickles: frames as Parquet, plain
+# values (statistics, chart specs) as JSON and images as raw bytes. Anything
+# that fails to decode is treated as a miss.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+FINGERPRINT_CHUNK = 1024 * 1024  # bytes hashed per read
+TOUCH_INTERVAL = 60.0  # seconds before a hit refreshes an entry's LRU timestamp
+
+
+def dataset_fingerprint(path):
+    """Content fingerprint: size and SHA-256 of the bytes, independent of mtime,
+    so replicas with their own copy of the same dataset share entries."""
+    digest = hashlib.sha256(f"{os.path.getsize(path)}:".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(FINGERPRINT_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def library_versions(names):
+    """Installed versions of `names`; cached frames and images depend on them too."""
+    versions = []
+    for name in names:
+        try:
+            versions.append((name, metadata.version(name)))
+        except metadata.PackageNotFoundError:
+            versions.append((name, None))
+    return tuple(versions)
+
+
+SERIES_COLUMN = "__series__"  # Parquet column holding an unnamed Series
+
+
+def encode(value):
+    """(kind, bytes) for a cacheable value; raises TypeError for anything else."""
+    if isinstance(value, bytes):
+        return "bytes", value
+    if isinstance(value, pd.DataFrame):
+        return "frame", value.to_parquet()
+    if isinstance(value, pd.Series):
+        name = SERIES_COLUMN if value.name is None else str(value.name)
+        return "series", value.to_frame(name=name).to_parquet()
+    return "json", json.dumps(value).encode()
+
+
+def decode(kind, blob):
+    if kind == "bytes":
+        return bytes(blob)
+    if kind == "frame":
+        return pd.read_parquet(io.BytesIO(blob))
+    if kind == "series":
+        series = pd.read_parquet(io.BytesIO(blob)).iloc[:, 0]
+        return series.rename(None) if series.name == SERIES_COLUMN else series
+    if kind == "json":
+        return json.loads(blob)
+    raise ValueError(f"unknown artifact kind {kind!r}")
+
+
+def code_version(paths):
+    """Hash of the given source files; any code change invalidates the cache."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ResultStore:
+    """Size-bounded key/value store in a SQLite file.
+
+    `path=None` disables the store: every lookup misses and nothing is written.
+    Storage errors (locked database, full disk...) are treated as misses so the
+    dashboard keeps working without the cache.
+    """
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024, timeout=30.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        if path is not None:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with self._connect() as con:
+                con.execute(SCHEMA)
+                con.execute("CREATE INDEX IF NOT EXISTS artifacts_accessed ON artifacts (accessed)")
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def _connect(self, timeout=None):
+        # short-lived connections: safe across Streamlit's session threads and
+        # across processes sharing the file
+        timeout = self.timeout if timeout is None else timeout
+        con = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        return _Closing(con)
+
+    def _touch(self, key):
+        # LRU bookkeeping is best effort: timeout=0 gives up at once if another
+        # replica holds the write lock instead of stalling the read behind it
+        try:
+            with self._connect(timeout=0) as con:
+                con.execute("UPDATE artifacts SET accessed = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error:
+            pass
+
+    @staticmethod
+    def make_key(*parts):
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    def get(self, key):
+        """Return the decoded value, or raise KeyError on a miss."""
+        if not self.enabled:
+            raise KeyError(key)
+        try:
+            with self._connect() as con:
+                row = con.execute("SELECT kind, value, accessed FROM artifacts WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            raise KeyError(key)
+        if row is None:
+            raise KeyError(key)
+        try:
+            value = decode(row[0], row[1])
+        except Exception:
+            raise KeyError(key)  # corrupt entry or written by an incompatible library version
+        if time.time() - row[2] > TOUCH_INTERVAL:
+            self._touch(key)
+        return value
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        try:
+            kind, blob = encode(value)
+        except Exception:
+            return  # not representable as data; simply not cached
+        if len(blob) > self.max_bytes:
+            return
+        try:
+            with self._connect() as con:
+                con.execute("BEGIN IMMEDIATE")
+                try:
+                    con.execute(
+                        "INSERT OR REPLACE INTO artifacts (key, kind, value, size, accessed) VALUES (?, ?, ?, ?, ?)",
+                        (key, kind, blob, len(blob), time.time()),
+                    )
+                    self._evict(con)
+                    con.execute("COMMIT")
+                except BaseException:
+                    con.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, con):
+        total = con.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        stale = []
+        for key, size in con.execute("SELECT key, size FROM artifacts ORDER BY accessed"):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        con.executemany("DELETE FROM artifacts WHERE key = ?", stale)
+
+    def get_or_compute(self, key, compute):
+        try:
+            return self.get(key)
+        except KeyError:
+            value = compute()
+            self.set(key, value)
+            return value
+
+
+class _Closing:
+    def __init__(self, con):
+        self.con = con
+
+    def __enter__(self):
+        return self.con
+
+    def __exit__(self, *exc):
+        self.con.close()
+
+
+# -----------------------
+# Backend wrapper
+# -----------------------
+# Worth a round trip to the shared store; the rest (count, unique, mean...) is
+# cheap enough that only the in-process memo below serves it.
+STORED_AGGREGATES = {
+    "describe", "corr", "corr_pair", "value_counts", "group_mean",
+    "missing_count", "duplicate_count", "info", "box_stats", "sample",
+}
+MEMO_SIZE = 256  # results kept in process memory, shared by all sessions
+
+
+def private_copy(value):
+    """Copy of a memoized value, so no session can mutate another's result."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, (list, dict, tuple)):
+        return copy.deepcopy(value)
+    return value  # scalars, str and bytes are immutable
+
+
+class CachedBackend(QueryBackend):
+    """Serves a backend's aggregates from memory and a ResultStore.
+
+    `namespace` identifies code version + dataset; the wrapped backend's
+    `filters` identify the filter state. Every result is memoized in-process;
+    `STORED_AGGREGATES` and `cached` artifacts are also shared through the
+    store. `head` goes straight to the backend.
+
+    `is_current`, if given, is called after each computation; when it returns
+    False the dataset changed under the backend, so the result is returned but
+    neither memoized nor stored under the (now stale) namespace.
+    """
+
+    _memo = OrderedDict()
+    _memo_lock = threading.Lock()
+
+    def __init__(self, inner, store, namespace, is_current=None):
+        self._inner = inner
+        self._store = store
+        self._namespace = namespace
+        self._is_current = is_current
+        self.filters = inner.filters
+        self.columns = inner.columns
+
+    def cache_key(self, name, *args):
+        return self._store.make_key(self._namespace, self.filters, name, args)
+
+    def _current(self):
+        return self._is_current is None or self._is_current()
+
+    def _memoized(self, key, compute):
+        with self._memo_lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return private_copy(self._memo[key])
+        value = compute()
+        if not self._current():
+            return value
+        with self._memo_lock:
+            self._memo[key] = value
+            while len(self._memo) > MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return private_copy(value)
+
+    def cached(self, name, compute, *args):
+        """Store any artifact derived from the current filter state (charts, images...)."""
+        key = self.cache_key(name, *args)
+
+        def load():
+            try:
+                return self._store.get(key)
+            except KeyError:
+                value = compute()
+                if self._current():
+                    self._store.set(key, value)
+                return value
+
+        return self._memoized(key, load)
+
+    def _aggregate(self, name, *args):
+        def compute():
+            return getattr(self._inner, name)(*args)
+
+        if name in STORED_AGGREGATES:
+            return self.cached(name, compute, *args)
+        return self._memoized(self.cache_key(name, *args), compute)
+
+    def isin(self, column, values):
+        return CachedBackend(self._inner.isin(column, values), self._store, self._namespace, self._is_current)
+
+    def between(self, column, low, high):
+        return CachedBackend(self._inner.between(column, low, high), self._store, self._namespace, self._is_current)
+
+    def count(self):
+        return self._aggregate("count")
+
+    def numeric_columns(self):
+        return self._aggregate("numeric_columns")
+
+    def unique(self, column):
+        return self._aggregate("unique", column)
+
+    def value_range(self, column):
+        return self._aggregate("value_range", column)
+
+    def mean(self, column):
+        return self._aggregate("mean", column)
+
+    def share_at_least(self, column, threshold):
+        return self._aggregate("share_at_least", column, threshold)
+
+    def missing_count(self):
+        return self._aggregate("missing_count")
+
+    def duplicate_count(self):
+        return self._aggregate("duplicate_count")
+
+    def head(self, n):
+        return self._inner.head(n)
+
+    def info(self):
+        return self._aggregate("info")
+
+    def value_counts(self, column):
+        return self._aggregate("value_counts", column)
+
+    def group_mean(self, by, column):
+        return self._aggregate("group_mean", by, column)
+
+    def describe(self):
+        return self._aggregate("describe")
+
+    def corr(self):
+        return self._aggregate("corr")
+
+    def corr_pair(self, a, b):
+        return self._aggregate("corr_pair", a, b)
+
+    def box_stats(self, column, max_outliers=BOX_MAX_OUTLIERS):
+        return self._aggregate("box_stats", column, max_outliers)
+
+    def sample(self, columns, n):
+        return self._aggregate("sample", list(columns), n)
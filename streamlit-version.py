@@ -1,12 +1,16 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import io
 import seaborn as sns
 import matplotlib.pyplot as plt
 import plotly.express as px
 import altair as alt
 import io
+import os
+
+import backends
+import result_cache
+from backends import DuckDBBackend, PandasBackend
+from result_cache import CachedBackend, ResultStore, code_version, dataset_fingerprint, library_versions
 
 # -----------------------
 # Page config + header
@@ -27,18 +31,105 @@ st.markdown(
 # -----------------------
 # Load dataset (fixed)
 # -----------------------
+# DASHBOARD_BACKEND=pandas (default) keeps the whole dataset in memory;
+# DASHBOARD_BACKEND=duckdb pushes filters/aggregates down into DuckDB over
+# DASHBOARD_DATA (.csv, .parquet or a .duckdb file with a `students` table).
+BACKENDS = ("pandas", "duckdb")
+BACKEND = os.environ.get("DASHBOARD_BACKEND", "pandas").strip().lower()
+DATA_PATH = os.environ.get("DASHBOARD_DATA", "student-mat.csv")
+SCATTER_SAMPLE_ROWS = 5000  # scatter plots draw at most this many students
+
+if BACKEND not in BACKENDS:
+    st.error(f"❌ Unknown DASHBOARD_BACKEND `{BACKEND}`; expected one of: {', '.join(BACKENDS)}.")
+    st.stop()
+
+def dataset_version(path):
+    # part of the loaders' cache keys, so a file replaced in place is reloaded
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+# The dataset fingerprint (part of every result-cache key) is taken together
+# with the data it describes, so results are never stored under a fingerprint
+# of a different file version.
 @st.cache_data(show_spinner=False)
-def load_data(path="student-mat.csv"):
+def load_data(path="student-mat.csv", version=None):
     try:
-        df = pd.read_csv(path)
-        if df.shape[1] == 1:  # sometimes ; separator is used
-            df = pd.read_csv(path, sep=";")
-        return df
+        for _ in range(3):
+            fingerprint = dataset_fingerprint(path)
+            df = pd.read_csv(path)
+            if df.shape[1] == 1:  # sometimes ; separator is used
+                df = pd.read_csv(path, sep=";")
+            if dataset_version(path) == version:  # not replaced while hashing/reading
+                return df, fingerprint
+            version = dataset_version(path)
+        raise RuntimeError("the file kept changing while it was being read")
     except Exception as e:
         st.error(f"❌ Failed to load dataset: {e}")
         st.stop()
 
-df = load_data()
+# DuckDB reads CSV/Parquet sources on every query, so the version the
+# fingerprint belongs to is returned too and re-checked before results are cached.
+@st.cache_resource(show_spinner=False)
+def open_duckdb(path, version=None):
+    try:
+        for _ in range(3):
+            fingerprint = dataset_fingerprint(path)
+            if dataset_version(path) == version:  # not replaced while hashing
+                backend = DuckDBBackend.open(path, table=os.environ.get("DASHBOARD_TABLE", "students"))
+                return backend, fingerprint, version
+            version = dataset_version(path)
+        raise RuntimeError("the file kept changing while it was being read")
+    except Exception as e:
+        st.error(f"❌ Failed to open dataset with DuckDB: {e}")
+        st.stop()
+
+if BACKEND == "duckdb":
+    data, fingerprint, opened_version = open_duckdb(DATA_PATH, dataset_version(DATA_PATH))
+
+    def is_current():
+        return dataset_version(DATA_PATH) == opened_version
+else:
+    df, fingerprint = load_data(DATA_PATH, dataset_version(DATA_PATH))
+    data = PandasBackend(df)
+    is_current = None  # the in-memory DataFrame always matches its fingerprint
+
+# -----------------------
+# Shared result cache
+# -----------------------
+# DASHBOARD_CACHE=/shared/volume/results.sqlite stores computed statistics and
+# charts on disk so every replica (and every restart) reuses them.
+# Unset = no persistent cache. DASHBOARD_CACHE_MB caps its size (default 512).
+@st.cache_resource(show_spinner=False)
+def open_store(path, max_mb):
+    try:
+        return ResultStore(path, max_bytes=int(max_mb * 1024 * 1024))
+    except Exception as e:
+        st.warning(f"⚠️ Result cache disabled: {e}")
+        return ResultStore(None)
+
+@st.cache_resource(show_spinner=False)
+def source_version():
+    # cached frames and images also depend on the libraries that produced them,
+    # which can differ between replicas during a rolling deploy
+    code = os.environ.get("DASHBOARD_CODE_VERSION") or code_version(
+        [__file__, backends.__file__, result_cache.__file__]
+    )
+    return code, library_versions(
+        ["pandas", "numpy", "pyarrow", "duckdb", "matplotlib", "seaborn", "altair", "plotly"]
+    )
+
+store = open_store(os.environ.get("DASHBOARD_CACHE") or None, float(os.environ.get("DASHBOARD_CACHE_MB", 512)))
+data = CachedBackend(data, store, (source_version(), BACKEND, fingerprint), is_current)
+
+def figure_png(fig):
+    # same output st.pyplot produces, but as bytes that can be cached
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=200)
+    plt.close(fig)
+    return buffer.getvalue()
 
 # -----------------------
 # Sidebar Filters (with Reset + Empty Check)
@@ -46,90 +137,85 @@ df = load_data()
 st.sidebar.header("🔎 Filters")
 
 # --- Initialize defaults in session state ---
-if "selected_gender" not in st.session_state and "sex" in df.columns:
-    st.session_state["selected_gender"] = df["sex"].unique().tolist()
+if "selected_gender" not in st.session_state and "sex" in data.columns:
+    st.session_state["selected_gender"] = data.unique("sex")
 
-if "selected_school" not in st.session_state and "school" in df.columns:
-    st.session_state["selected_school"] = df["school"].unique().tolist()
+if "selected_school" not in st.session_state and "school" in data.columns:
+    st.session_state["selected_school"] = data.unique("school")
 
-if "selected_medu" not in st.session_state and "Medu" in df.columns:
-    st.session_state["selected_medu"] = sorted(df["Medu"].unique())
+if "selected_medu" not in st.session_state and "Medu" in data.columns:
+    st.session_state["selected_medu"] = sorted(data.unique("Medu"))
 
-if "studytime_range" not in st.session_state and "studytime" in df.columns:
-    st.session_state["studytime_range"] = (
-        int(df["studytime"].min()),
-        int(df["studytime"].max())
-    )
+if "studytime_range" not in st.session_state and "studytime" in data.columns:
+    st.session_state["studytime_range"] = tuple(map(int, data.value_range("studytime")))
 
 # --- Reset Button ---
 if st.sidebar.button("🔄 Reset Filters"):
-    if "sex" in df.columns:
-        st.session_state["selected_gender"] = df["sex"].unique().tolist()
-    if "school" in df.columns:
-        st.session_state["selected_school"] = df["school"].unique().tolist()
-    if "Medu" in df.columns:
-        st.session_state["selected_medu"] = sorted(df["Medu"].unique())
-    if "studytime" in df.columns:
-        st.session_state["studytime_range"] = (
-            int(df["studytime"].min()),
-            int(df["studytime"].max())
-        )
+    if "sex" in data.columns:
+        st.session_state["selected_gender"] = data.unique("sex")
+    if "school" in data.columns:
+        st.session_state["selected_school"] = data.unique("school")
+    if "Medu" in data.columns:
+        st.session_state["selected_medu"] = sorted(data.unique("Medu"))
+    if "studytime" in data.columns:
+        st.session_state["studytime_range"] = tuple(map(int, data.value_range("studytime")))
 
 # --- Gender filter ---
-if "sex" in df.columns:
+if "sex" in data.columns:
     selected_gender = st.sidebar.multiselect(
         "Filter by Gender",
-        options=df["sex"].unique(),
+        options=data.unique("sex"),
         default=st.session_state["selected_gender"]
     )
     st.session_state["selected_gender"] = selected_gender
-    df = df[df["sex"].isin(selected_gender)]
+    data = data.isin("sex", selected_gender)
 
 # --- School filter ---
-if "school" in df.columns:
+if "school" in data.columns:
     selected_school = st.sidebar.multiselect(
         "Filter by School",
-        options=df["school"].unique(),
+        options=data.unique("school"),
         default=st.session_state["selected_school"]
     )
     st.session_state["selected_school"] = selected_school
-    df = df[df["school"].isin(selected_school)]
+    data = data.isin("school", selected_school)
 
 # --- Parental education filter ---
-if "Medu" in df.columns:
+if "Medu" in data.columns:
     selected_medu = st.sidebar.multiselect(
         "Mother's Education Level",
-        options=sorted(df["Medu"].unique()),
+        options=sorted(data.unique("Medu")),
         default=st.session_state["selected_medu"]
     )
     st.session_state["selected_medu"] = selected_medu
-    df = df[df["Medu"].isin(selected_medu)]
+    data = data.isin("Medu", selected_medu)
 
 # --- Studytime filter ---
-if "studytime" in df.columns:
+if "studytime" in data.columns:
+    studytime_min, studytime_max = data.value_range("studytime")
     studytime_range = st.sidebar.slider(
         "Studytime (hours/week)",
-        min_value=int(df["studytime"].min()),
-        max_value=int(df["studytime"].max()),
+        min_value=int(studytime_min),
+        max_value=int(studytime_max),
         value=st.session_state["studytime_range"]
     )
     st.session_state["studytime_range"] = studytime_range
-    df = df[(df["studytime"] >= studytime_range[0]) & (df["studytime"] <= studytime_range[1])]
+    data = data.between("studytime", studytime_range[0], studytime_range[1])
 
 # --- Dataset Summary ---
 st.sidebar.markdown("---")
-if df.empty:
+if data.empty:
     st.sidebar.error("⚠️ No data available with the selected filters.")
 else:
     st.sidebar.markdown(
         f"""
         📊 **Dataset Overview**  
-        - Total Students: `{len(df)}`  
-        - Columns: `{len(df.columns)}`  
+        - Total Students: `{len(data)}`  
+        - Columns: `{len(data.columns)}`  
         - Active Filters:  
-          • Gender = {", ".join(selected_gender) if "sex" in df.columns else "N/A"}  
-          • School = {", ".join(selected_school) if "school" in df.columns else "N/A"}  
-          • Medu = {", ".join(map(str, selected_medu)) if "Medu" in df.columns else "N/A"}  
+          • Gender = {", ".join(selected_gender) if "sex" in data.columns else "N/A"}  
+          • School = {", ".join(selected_school) if "school" in data.columns else "N/A"}  
+          • Medu = {", ".join(map(str, selected_medu)) if "Medu" in data.columns else "N/A"}  
           • Studytime = {studytime_range[0]}–{studytime_range[1]} hrs/week  
         """
     )
@@ -144,12 +230,12 @@ col0, col1, col2, col3, col4 = st.columns([1, 2, 2, 2, 1])
 with col1:
     st.metric(
         label="👥 Total Students",
-        value=len(df)
+        value=len(data)
     )
 
 with col2:
-    if "G3" in df.columns:
-        avg_g3 = round(df["G3"].mean(), 2)
+    if "G3" in data.columns:
+        avg_g3 = round(data.mean("G3"), 2)
         st.metric(
             label="📊 Average Final Grade (G3)",
             value=avg_g3
@@ -158,8 +244,8 @@ with col2:
         st.metric("📊 Average Final Grade (G3)", "N/A")
 
 with col3:
-    if "G3" in df.columns:
-        pass_rate = (df["G3"] >= 10).mean() * 100  # assume passing is ≥ 10
+    if "G3" in data.columns:
+        pass_rate = data.share_at_least("G3", 10) * 100  # assume passing is ≥ 10
         st.metric(
             label="✅ Pass Rate",
             value=f"{pass_rate:.1f}%"
@@ -216,9 +302,9 @@ with tab1:
     """)
 
     # --- Metrics Row ---
-    n_rows, n_cols = df.shape
-    n_missing = int(df.isnull().sum().sum())
-    n_duplicates = int(df.duplicated().sum())
+    n_rows, n_cols = len(data), len(data.columns)
+    n_missing = data.missing_count()
+    n_duplicates = data.duplicate_count()
 
     colA, colB, colC, colD = st.columns(4)
     colA.markdown(f"<div class='metric-card'>Rows<br>{n_rows:,}</div>", unsafe_allow_html=True)
@@ -229,16 +315,14 @@ with tab1:
     # --- Data Preview ---
     st.markdown("### 🔍 Data Preview")
     rows_to_show = st.slider("Rows to display", 5, 30, 10)
-    st.dataframe(df.head(rows_to_show), use_container_width=True)
+    st.dataframe(data.head(rows_to_show), use_container_width=True)
 
     # --- Split Layout: Info + Graphs ---
     col1, col2 = st.columns([1, 1.5])
 
     with col1:
         st.markdown("### 📑 Data Info")       
-        buffer = io.StringIO()
-        df.info(buf=buffer)
-        info_str = buffer.getvalue()
+        info_str = data.info()
     
         st.markdown(
             f"""
@@ -269,8 +353,8 @@ with tab1:
         st.markdown("### 📊 Key Distributions")
 
         # Gender distribution
-        if "sex" in df.columns:
-            gender_counts = df["sex"].value_counts().reset_index()
+        if "sex" in data.columns:
+            gender_counts = data.value_counts("sex").reset_index()
             gender_counts.columns = ["Gender", "Count"]
         
             fig1 = px.bar(
@@ -300,8 +384,8 @@ with tab1:
             st.caption("👩‍🎓👨‍🎓 Female students slightly outnumber male students in this dataset.")
 
         # Failures distribution
-        if "failures" in df.columns:
-            fail_counts = df["failures"].value_counts().reset_index()
+        if "failures" in data.columns:
+            fail_counts = data.value_counts("failures").reset_index()
             fail_counts.columns = ["Failures", "Count"]
         
             fig2 = px.bar(
@@ -326,7 +410,7 @@ with tab1:
    # --- Summary Stats ---
             st.markdown("### 📈 Summary Statistics")
             
-            num_desc = df.describe(include=[np.number]).transpose()
+            num_desc = data.describe()
             st.dataframe(num_desc, use_container_width=True)
             st.caption("""
             This table provides key **descriptive statistics** for all numeric features in the dataset.  
@@ -342,23 +426,25 @@ with tab1:
 # -----------------------
 with tab2:
     st.markdown("### 🔗 Correlation Heatmap")
-    corr = df.corr(numeric_only=True)
-
-    fig, ax = plt.subplots(figsize=(7, 4))
-    sns.heatmap(
-        corr,
-        annot=True,
-        fmt=".2f",
-        cmap="coolwarm",
-        ax=ax,
-        cbar=True,
-        annot_kws={"size": 6}
-    )
+    corr = data.corr()
+
+    def render_heatmap():
+        fig, ax = plt.subplots(figsize=(7, 4))
+        sns.heatmap(
+            corr,
+            annot=True,
+            fmt=".2f",
+            cmap="coolwarm",
+            ax=ax,
+            cbar=True,
+            annot_kws={"size": 6}
+        )
 
-    ax.set_xticklabels(ax.get_xticklabels(), fontsize=7, rotation=45, ha="right")
-    ax.set_yticklabels(ax.get_yticklabels(), fontsize=7)
+        ax.set_xticklabels(ax.get_xticklabels(), fontsize=7, rotation=45, ha="right")
+        ax.set_yticklabels(ax.get_yticklabels(), fontsize=7)
+        return figure_png(fig)
 
-    st.pyplot(fig, use_container_width=True)
+    st.image(data.cached("heatmap_png", render_heatmap), use_container_width=True)
 
     st.markdown("""
     ###  Interpretation
@@ -382,7 +468,7 @@ with tab2:
 with tab3:
     st.markdown("### 📦 Boxplots — Numeric Feature Distributions")
 
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_cols = data.numeric_columns()
     feature = st.selectbox(
         "Choose a numeric feature to visualize:",
         numeric_cols,
@@ -392,27 +478,33 @@ with tab3:
     # Custom color palette (your theme)
     custom_colors = ["#f3ff8c", "#e76d00", "#2d642b"]
 
-    fig, ax = plt.subplots(figsize=(7, 4))
-    sns.boxplot(
-        data=df, 
-        y=feature, 
-        ax=ax, 
-        color=custom_colors[1],   # main accent (orange) for box
-        boxprops=dict(facecolor=custom_colors[1], alpha=0.7, edgecolor="black"),
-        medianprops=dict(color=custom_colors[0], linewidth=2),  # neon yellow median line
-        whiskerprops=dict(color=custom_colors[2], linewidth=1.5),
-        capprops=dict(color=custom_colors[2], linewidth=1.5),
-        flierprops=dict(marker='o', color=custom_colors[0], markersize=5, alpha=0.8)  # outliers
-    )
+    def render_boxplot():
+        # quartiles, whiskers and outliers come from the backend, not the raw column
+        stats = data.box_stats(feature)
+        fig, ax = plt.subplots(figsize=(7, 4))
+        if stats is not None:  # an empty selection draws empty axes
+            ax.bxp(
+                [stats],
+                patch_artist=True,
+                widths=0.5,
+                boxprops=dict(facecolor=custom_colors[1], alpha=0.7, edgecolor="black"),  # main accent (orange) for box
+                medianprops=dict(color=custom_colors[0], linewidth=2),  # neon yellow median line
+                whiskerprops=dict(color=custom_colors[2], linewidth=1.5),
+                capprops=dict(color=custom_colors[2], linewidth=1.5),
+                flierprops=dict(marker='o', color=custom_colors[0], markersize=5, alpha=0.8)  # outliers
+            )
 
-    # Style tweaks for white background
-    ax.set_facecolor("white")
-    ax.set_title(f"Distribution of {feature}", color="black", fontsize=12)
-    ax.tick_params(colors="black")
-    for spine in ax.spines.values():
-        spine.set_color("black")
+        # Style tweaks for white background
+        ax.set_xticks([])
+        ax.set_ylabel(feature)
+        ax.set_facecolor("white")
+        ax.set_title(f"Distribution of {feature}", color="black", fontsize=12)
+        ax.tick_params(colors="black")
+        for spine in ax.spines.values():
+            spine.set_color("black")
+        return figure_png(fig)
 
-    st.pyplot(fig, use_container_width=True)
+    st.image(data.cached("boxplot_png", render_boxplot, feature), use_container_width=True)
 
     st.markdown(
         f"""
@@ -432,14 +524,17 @@ with tab3:
 with tab4:
     st.markdown("### 🫧 Interactive Scatter Plot")
 
-    if "studytime" in df.columns and "G3" in df.columns:
+    if "studytime" in data.columns and "G3" in data.columns:
+        # only a capped sample of the plotted columns is pulled out of the backend
+        scatter_cols = [c for c in ["studytime", "G3", "sex", "absences", "age", "famsize", "failures"] if c in data.columns]
+        scatter_df = data.sample(scatter_cols, SCATTER_SAMPLE_ROWS)
         fig = px.scatter(
-            df,
+            scatter_df,
             x="studytime",
             y="G3",
-            color="sex" if "sex" in df.columns else None,
-            size="absences" if "absences" in df.columns else None,
-            hover_data=["age", "famsize", "failures"] if "age" in df.columns else None,
+            color="sex" if "sex" in data.columns else None,
+            size="absences" if "absences" in data.columns else None,
+            hover_data=["age", "famsize", "failures"] if "age" in data.columns else None,
             title="Studytime vs Final Grade (G3)",
             color_discrete_map={
                 "F": "#f3ff8c",   # female = neon yellow-green
@@ -450,7 +545,7 @@ with tab4:
         )
 
         # Scale bubble size more clearly
-        fig.update_traces(marker=dict(sizeref=2.*max(df["absences"])/40**2))
+        fig.update_traces(marker=dict(sizeref=2.*max(scatter_df["absences"])/40**2))
 
         st.plotly_chart(fig, use_container_width=True)
 
@@ -482,9 +577,9 @@ with tab5:
     )
 
     # Q1: Correlations with G3
-    if "G3" in df.columns:
+    if "G3" in data.columns:
         st.markdown("##### Q1. Which features have the highest correlation with the final exam scores (G3)?")
-        corr_sorted = df.corr(numeric_only=True)["G3"].drop("G3").sort_values(ascending=False)
+        corr_sorted = data.corr()["G3"].drop("G3").sort_values(ascending=False)
         top_corr = corr_sorted.head(5).reset_index()
         top_corr.columns = ["Feature", "Correlation"]
 
@@ -511,9 +606,9 @@ with tab5:
 
 
     # Q2: Studytime correlation
-    if "studytime" in df.columns and "G3" in df.columns:
+    if "studytime" in data.columns and "G3" in data.columns:
         st.markdown("##### Q2. How does study time correlate with exam performance?")
-        study_corr = df["studytime"].corr(df["G3"])
+        study_corr = data.corr_pair("studytime", "G3")
         st.markdown(
             f"""
             <div style="font-size:16px; line-height:1.5;">
@@ -548,9 +643,9 @@ with tab5:
 
 
     # Q4: Gender impact
-    if "sex" in df.columns and "G3" in df.columns:
+    if "sex" in data.columns and "G3" in data.columns:
         st.markdown("##### Q4. How does gender impact the final exam score?")
-        avg_scores = df.groupby("sex")["G3"].mean().reset_index()
+        avg_scores = data.group_mean("sex", "G3").reset_index()
     
         bars2 = alt.Chart(avg_scores).mark_bar(cornerRadiusTopLeft=8, cornerRadiusTopRight=8).encode(
             x=alt.X("sex:N", title="Gender"),
@@ -578,10 +673,10 @@ with tab5:
         )
 
     # Q5: Attendance / Absences
-    if "absences" in df.columns and "G3" in df.columns:
+    if "absences" in data.columns and "G3" in data.columns:
         st.markdown("##### Q5. Do absences affect grades?")
     
-        abs_corr = df["absences"].corr(df["G3"])
+        abs_corr = data.corr_pair("absences", "G3")
         
         st.markdown(
             f"<small>Correlation coefficient between absences and final grade (G3): "
@@ -590,7 +685,8 @@ with tab5:
         )
     
         # --- Chart (dark-themed) ---
-        abs_scatter = alt.Chart(df).mark_circle(size=70, opacity=0.7).encode(
+        abs_df = data.sample([c for c in ["absences", "G3", "sex", "studytime"] if c in data.columns], SCATTER_SAMPLE_ROWS)
+        abs_scatter = alt.Chart(abs_df).mark_circle(size=70, opacity=0.7).encode(
             x=alt.X("absences:Q", title="Number of Absences"),
             y=alt.Y("G3:Q", title="Final Grade (G3)"),
             color=alt.Color("sex:N", scale=alt.Scale(range=["#f3ff8c", "#e76d00"])),  # palette: neon yellow-green & orange
@@ -628,7 +724,7 @@ with tab5:
 
 
     # Q6: Negative correlations
-    if "G3" in df.columns:
+    if "G3" in data.columns:
         st.markdown("##### Q6. Which features are most negatively correlated with G3?")
     
         bottom_corr = corr_sorted.tail(5).reset_index()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the dashboard modules live at the repository root, next to streamlit-version.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATASET = os.path.join(ROOT, "student-mat.csv")
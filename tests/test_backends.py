@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backends import PandasBackend, QueryBackend
+from conftest import DATASET
+
+duckdb = pytest.importorskip("duckdb")
+from backends import DuckDBBackend  # noqa: E402
+
+FILTERS = [
+    [],
+    [("isin", "sex", ["F"])],
+    [("isin", "sex", ["M", "F"]), ("isin", "Medu", [np.int64(2), 4]), ("between", "studytime", 1, 3)],
+    [("isin", "school", ["MS"]), ("between", "studytime", 2, 2)],
+    [("isin", "sex", [])],
+]
+
+
+def narrow(backend, filters):
+    for op, column, *args in filters:
+        backend = backend.isin(column, *args) if op == "isin" else backend.between(column, *args)
+    return backend
+
+
+def assert_parity(left, right, group_by, numeric):
+    assert left.count() == right.count()
+    assert left.columns == right.columns
+    assert left.numeric_columns() == right.numeric_columns()
+    assert left.missing_count() == right.missing_count()
+    assert left.duplicate_count() == right.duplicate_count()
+    assert sorted(left.unique(group_by), key=repr) == sorted(right.unique(group_by), key=repr)
+    assert np.allclose(left.value_range(numeric), right.value_range(numeric), equal_nan=True)
+    assert left.mean(numeric) == pytest.approx(right.mean(numeric), nan_ok=True)
+    assert left.share_at_least(numeric, 10) == pytest.approx(right.share_at_least(numeric, 10), nan_ok=True)
+    assert left.value_counts(group_by).to_dict() == right.value_counts(group_by).to_dict()
+    assert left.group_mean(group_by, numeric).to_dict() == pytest.approx(right.group_mean(group_by, numeric).to_dict())
+    pd.testing.assert_frame_equal(left.describe(), right.describe(), check_dtype=False)
+    pd.testing.assert_frame_equal(left.corr(), right.corr(), check_dtype=False)
+    assert left.corr_pair(numeric, left.numeric_columns()[0]) == pytest.approx(
+        right.corr_pair(numeric, right.numeric_columns()[0]), nan_ok=True
+    )
+    assert left.box_stats(numeric) == right.box_stats(numeric)
+    assert len(left.sample([group_by, numeric], 50)) == len(right.sample([group_by, numeric], 50)) == min(50, left.count())
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_duckdb_matches_pandas_on_dataset(filters):
+    df = pd.read_csv(DATASET, sep=";")
+    pandas_backend = narrow(PandasBackend(df), filters)
+    duckdb_backend = narrow(DuckDBBackend.open(DATASET), filters)
+
+    assert pandas_backend.filters == duckdb_backend.filters
+    assert_parity(pandas_backend, duckdb_backend, "sex", "G3")
+    assert_parity(pandas_backend, duckdb_backend, "failures", "absences")
+
+
+def test_duckdb_matches_pandas_with_nulls_and_duplicates(tmp_path):
+    path = tmp_path / "students.csv"
+    path.write_text(
+        "school;sex;G3;absences\n"
+        "GP;F;12;4\n"
+        "GP;F;12;4\n"
+        "MS;;8;\n"
+        ";M;;30\n"
+        "MS;M;15;2\n"
+        "GP;F;12;4\n"
+    )
+    pandas_backend = PandasBackend(pd.read_csv(path, sep=";"))
+    duckdb_backend = DuckDBBackend.open(str(path))
+
+    assert_parity(pandas_backend, duckdb_backend, "sex", "G3")
+    assert_parity(pandas_backend.isin("school", ["GP", "MS"]), duckdb_backend.isin("school", ["GP", "MS"]), "school", "absences")
+    assert duckdb_backend.duplicate_count() == 2
+    assert duckdb_backend.isin("sex", ["F"]).duplicate_count() == 2
+
+
+def test_filters_are_order_independent():
+    df = pd.read_csv(DATASET, sep=";")
+    assert PandasBackend(df).isin("Medu", [np.int64(4), 2]).filters == PandasBackend(df).isin("Medu", [2, 4]).filters
+    assert PandasBackend(df).between("studytime", 1, 10).filters == (("between", "studytime", (1, 10)),)
+
+
+def test_incomplete_backend_fails_on_creation():
+    class Partial(QueryBackend):
+        def count(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        Partial()
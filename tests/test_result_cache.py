@@ -0,0 +1,191 @@
+import os
+import shutil
+import sqlite3
+import time
+
+import pandas as pd
+import pytest
+
+import result_cache
+from backends import PandasBackend
+from conftest import DATASET
+from result_cache import CachedBackend, ResultStore, dataset_fingerprint
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "cache" / "results.sqlite")
+
+
+def stored_keys(path):
+    with sqlite3.connect(path) as con:
+        return {row[0] for row in con.execute("SELECT key FROM artifacts")}
+
+
+def test_identical_dataset_copies_share_a_fingerprint(tmp_path):
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    shutil.copyfile(DATASET, first)
+    shutil.copyfile(DATASET, second)
+    os.utime(second, ns=(0, 0))  # e.g. a fresh checkout or rsync without -t
+
+    assert dataset_fingerprint(str(first)) == dataset_fingerprint(str(second))
+    df = pd.read_csv(DATASET, sep=";")
+    keys = {
+        CachedBackend(PandasBackend(df), ResultStore(None), ("v1", "pandas", dataset_fingerprint(str(path)))).cache_key("corr")
+        for path in (first, second)
+    }
+    assert len(keys) == 1
+
+
+def test_fingerprint_changes_with_content(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_bytes(b"G3\n10\n")
+    before = dataset_fingerprint(str(path))
+    path.write_bytes(b"G3\n11\n")  # same size, different content
+    assert dataset_fingerprint(str(path)) != before
+
+
+def test_round_trips_supported_kinds(store_path):
+    pytest.importorskip("pyarrow")
+    store = ResultStore(store_path)
+    frame = pd.DataFrame({"mean": [1.5, 2.0]}, index=pd.Index(["G1", "G2"], name="feature"))
+    series = pd.Series([3, 1], index=pd.Index(["F", "M"], name="sex"), name="count")
+    values = {"frame": frame, "series": series, "png": b"\x89PNG\r\n", "stats": {"q1": 8.0, "fliers": [0.0]}}
+    for key, value in values.items():
+        store.set(key, value)
+
+    pd.testing.assert_frame_equal(store.get("frame"), frame)
+    pd.testing.assert_series_equal(store.get("series"), series)
+    assert store.get("png") == values["png"]
+    assert store.get("stats") == values["stats"]
+
+
+def test_overwrite_replaces_value_and_size(store_path):
+    store = ResultStore(store_path)
+    store.set("k", b"x" * 100)
+    store.set("k", b"y" * 10)
+
+    assert store.get("k") == b"y" * 10
+    with sqlite3.connect(store_path) as con:
+        assert con.execute("SELECT count(*), sum(size) FROM artifacts").fetchone() == (1, 10)
+
+
+def test_evicts_least_recently_used_entries(store_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "TOUCH_INTERVAL", 0.0)
+    store = ResultStore(store_path, max_bytes=300)
+    for key in ("a", "b", "c"):
+        store.set(key, b"x" * 100)
+        time.sleep(0.01)
+    store.get("a")  # "b" is now the least recently used entry
+
+    store.set("d", b"x" * 100)
+
+    assert stored_keys(store_path) == {"a", "c", "d"}
+
+
+def test_skips_values_larger_than_the_store(store_path):
+    store = ResultStore(store_path, max_bytes=10)
+    store.set("big", b"x" * 11)
+    assert stored_keys(store_path) == set()
+
+
+def test_corrupt_and_unknown_entries_are_misses(store_path):
+    pytest.importorskip("pyarrow")
+    store = ResultStore(store_path)
+    store.set("frame", pd.DataFrame({"a": [1]}))
+    store.set("other", b"ok")
+    with sqlite3.connect(store_path) as con:
+        con.execute("UPDATE artifacts SET value = x'00' WHERE key = 'frame'")
+        con.execute("UPDATE artifacts SET kind = 'pickle' WHERE key = 'other'")
+
+    for key in ("frame", "other"):
+        with pytest.raises(KeyError):
+            store.get(key)
+    assert store.get_or_compute("frame", lambda: "recomputed") == "recomputed"
+
+
+def test_unencodable_values_are_not_cached(store_path):
+    store = ResultStore(store_path)
+    assert store.get_or_compute("obj", object) is not None
+    assert stored_keys(store_path) == set()
+
+
+def test_reads_do_not_wait_for_the_write_lock(store_path):
+    store = ResultStore(store_path, timeout=2.0)
+    store.set("k", b"v")
+    writer = sqlite3.connect(store_path, isolation_level=None)
+    writer.execute("UPDATE artifacts SET accessed = 0")  # due for an LRU touch
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.monotonic()
+        assert store.get("k") == b"v"
+        assert time.monotonic() - started < 1.0
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+
+def test_disabled_store_always_computes():
+    store = ResultStore(None)
+    store.set("k", b"v")
+    with pytest.raises(KeyError):
+        store.get("k")
+    assert store.get_or_compute("k", lambda: 5) == 5
+
+
+def test_cached_backend_shares_results_between_replicas(store_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(CachedBackend, "_memo", type(CachedBackend._memo)())
+    df = pd.read_csv(DATASET, sep=";")
+    calls = []
+
+    class CountingBackend(PandasBackend):
+        def isin(self, column, values):
+            narrowed = super().isin(column, values)
+            return CountingBackend(narrowed._df, narrowed.filters)
+
+        def corr(self):
+            calls.append("corr")
+            return super().corr()
+
+    first = CachedBackend(CountingBackend(df), ResultStore(store_path), ("v1",)).isin("sex", ["M", "F"])
+    expected = first.corr()
+    CachedBackend._memo.clear()  # a second replica starts with an empty process memo
+    second = CachedBackend(CountingBackend(df), ResultStore(store_path), ("v1",)).isin("sex", ["F", "M"])
+
+    pd.testing.assert_frame_equal(second.corr(), expected)
+    assert calls == ["corr"]
+    assert len(second) == len(df)
+    assert len(stored_keys(store_path)) == 1  # count stays out of the shared store
+
+
+def test_memoized_results_are_private_to_each_caller(monkeypatch):
+    monkeypatch.setattr(CachedBackend, "_memo", type(CachedBackend._memo)())
+    df = pd.read_csv(DATASET, sep=";")
+    backend = CachedBackend(PandasBackend(df), ResultStore(None), ("v1",))
+
+    backend.unique("sex").append("X")
+    corr = backend.corr()
+    corr.iloc[0, 0] = 99.0
+    backend.box_stats("absences")["fliers"].clear()
+
+    assert "X" not in backend.unique("sex")
+    assert backend.corr().iloc[0, 0] == 1.0
+    assert backend.box_stats("absences")["fliers"]
+
+
+def test_results_computed_after_the_dataset_changed_are_not_kept(store_path, monkeypatch):
+    monkeypatch.setattr(CachedBackend, "_memo", type(CachedBackend._memo)())
+    df = pd.read_csv(DATASET, sep=";")
+    current = {"value": True}
+    backend = CachedBackend(PandasBackend(df), ResultStore(store_path), ("v1",), lambda: current["value"])
+
+    current["value"] = False  # e.g. the CSV behind DuckDB was swapped mid-rerun
+    backend.isin("sex", ["F"]).corr()
+    backend.count()
+    assert stored_keys(store_path) == set()
+    assert not CachedBackend._memo
+
+    current["value"] = True
+    backend.isin("sex", ["F"]).corr()
+    assert len(stored_keys(store_path)) == 1